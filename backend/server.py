@@ -1,40 +1,95 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Response
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from bson import ObjectId
 import os
+import re
+import asyncio
 import logging
+import logging.config
 from pathlib import Path
+import pydantic
+import pydantic_core
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, TypedDict
 from datetime import datetime
+from bisect import bisect_right
+from functools import lru_cache
 import random
+import secrets
+import time
+import orjson
+import msgspec
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=50,
+    minPoolSize=10,
+    maxIdleTimeMS=30000,
+    compressors="zstd,zlib",
+    retryWrites=True,
+    serverSelectionTimeoutMS=5000
+)
 db = client[os.environ['DB_NAME']]
 
+# Helper for orjson/msgspec: Mongo documents carry ObjectId values they can't encode natively
+def orjson_default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError
+
+class MongoJSONResponse(ORJSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=orjson_default)
+
+ENCODER = msgspec.json.Encoder(enc_hook=orjson_default)
+
+def struct_response(content) -> Response:
+    return Response(ENCODER.encode(content), media_type="application/json")
+
+# In-process TTL cache for near-static catalog responses (key -> (stored_at, payload))
+CATALOG_CACHE_TTL = 60.0
+_CACHE: dict = {}
+
+def cache_get(key: str) -> Optional[bytes]:
+    entry = _CACHE.get(key)
+    if entry and time.monotonic() - entry[0] < CATALOG_CACHE_TTL:
+        return entry[1]
+    return None
+
+def cache_set(key: str, payload: bytes) -> bytes:
+    _CACHE[key] = (time.monotonic(), payload)
+    return payload
+
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=MongoJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Helper function to convert ObjectId to string
-def str_object_id(obj):
-    if isinstance(obj, dict):
-        obj['_id'] = str(obj['_id'])
-    return obj
+# Checking the hex form up front rejects malformed IDs without raising InvalidId
+_OID_RE = re.compile(r"[0-9a-fA-F]{24}")
+
+def parse_object_id(value: str) -> ObjectId:
+    if not _OID_RE.fullmatch(value):
+        raise HTTPException(status_code=400, detail="ID inválido")
+    return ObjectId(value)
 
 # ========== MODELS ==========
 
-class PointsHistoryItem(BaseModel):
-    date: datetime = Field(default_factory=datetime.utcnow)
+# Response DTOs are msgspec Structs; Pydantic is kept for request bodies and documents
+
+class PointsHistoryItem(msgspec.Struct, kw_only=True):
+    date: datetime = msgspec.field(default_factory=datetime.utcnow)
     points: int
     description: str
     type: str  # 'earned' or 'redeemed'
@@ -47,7 +102,7 @@ class User(BaseModel):
     avatar: str = ""  # Avatar initials or URL
     points: int = 0
     category: str = "Clásico"
-    pointsHistory: List[PointsHistoryItem] = []
+    pointsHistory: List[dict] = []  # PointsHistoryItem fields
     recycledKg: float = 0.0
     createdAt: datetime = Field(default_factory=datetime.utcnow)
 
@@ -55,7 +110,7 @@ class UserLogin(BaseModel):
     email: str
     password: str
 
-class UserResponse(BaseModel):
+class UserResponse(msgspec.Struct):
     id: str
     studentId: str
     name: str
@@ -67,6 +122,27 @@ class UserResponse(BaseModel):
     recycledKg: float
     nextCategory: Optional[dict] = None
 
+# Auth response user summary; a plain dict at runtime
+class _UserOut(TypedDict):
+    id: str
+    studentId: str
+    name: str
+    email: str
+    avatar: str
+    points: int
+    category: str
+
+def user_out(user: dict) -> _UserOut:
+    return _UserOut(
+        id=str(user["_id"]),
+        studentId=user["studentId"],
+        name=user["name"],
+        email=user["email"],
+        avatar=user["avatar"],
+        points=user["points"],
+        category=user["category"]
+    )
+
 class Container(BaseModel):
     name: str
     location: dict  # {x: float, y: float}
@@ -75,7 +151,7 @@ class Container(BaseModel):
     lastMaintenance: datetime = Field(default_factory=datetime.utcnow)
     type: str = "mixed"  # type of recycling
 
-class ContainerResponse(BaseModel):
+class ContainerResponse(msgspec.Struct):
     id: str
     name: str
     location: dict
@@ -93,7 +169,7 @@ class Reward(BaseModel):
     image: str
     location: str  # e.g., "Cafetín", "Librería"
 
-class RewardResponse(BaseModel):
+class RewardResponse(msgspec.Struct):
     id: str
     title: str
     description: str
@@ -117,39 +193,68 @@ class RedeemRequest(BaseModel):
     userId: str
     rewardId: str
 
+# Response builders: Struct init does no validation.
+# Trusted DB data — never call on untrusted input.
+def container_response(container: dict) -> ContainerResponse:
+    return ContainerResponse(
+        id=str(container["_id"]),
+        name=container["name"],
+        location=container["location"],
+        status=container["status"],
+        address=container["address"],
+        lastMaintenance=container["lastMaintenance"],
+        type=container["type"]
+    )
+
+def reward_response(reward: dict) -> RewardResponse:
+    return RewardResponse(
+        id=str(reward["_id"]),
+        title=reward["title"],
+        description=reward["description"],
+        pointsCost=reward["pointsCost"],
+        category=reward["category"],
+        available=reward["available"],
+        image=reward["image"],
+        location=reward["location"]
+    )
+
 # ========== CATEGORY LOGIC ==========
 
+# Points needed for each category after "Clásico"; CAT_ORDER[i] is the category
+# for bisect_right(_THRESHOLDS, points) == i
+_THRESHOLDS = (100, 300, 600, 1000)
+CAT_ORDER = ("Clásico", "Plata", "Oro", "Diamante", "Black")
+CAT_INDEX = {c: i for i, c in enumerate(CAT_ORDER)}
+
+# Pipeline-update stage that recomputes "category" from "points" on the server,
+# so writes that change points don't need a read + second write for the tier
+CATEGORY_PIPELINE = [
+    {"$set": {"category": {"$switch": {
+        "branches": [
+            {"case": {"$gte": ["$points", threshold]}, "then": name}
+            for threshold, name in reversed(list(zip(_THRESHOLDS, CAT_ORDER[1:])))
+        ],
+        "default": CAT_ORDER[0]
+    }}}}
+]
+
+@lru_cache(maxsize=2048)
 def get_category_from_points(points: int) -> str:
-    if points >= 1000:
-        return "Black"
-    elif points >= 600:
-        return "Diamante"
-    elif points >= 300:
-        return "Oro"
-    elif points >= 100:
-        return "Plata"
-    else:
-        return "Clásico"
+    return CAT_ORDER[bisect_right(_THRESHOLDS, points)]
 
 def get_next_category_info(points: int) -> Optional[dict]:
-    thresholds = [
-        (100, "Plata"),
-        (300, "Oro"),
-        (600, "Diamante"),
-        (1000, "Black")
-    ]
-    
-    for threshold, category in thresholds:
-        if points < threshold:
-            return {
-                "name": category,
-                "pointsNeeded": threshold - points,
-                "currentPoints": points,
-                "totalPoints": threshold,
-                "progress": (points / threshold) * 100
-            }
+    i = bisect_right(_THRESHOLDS, points)
+    if i == len(_THRESHOLDS):
+        return None  # Max category reached
     
-    return None  # Max category reached
+    threshold = _THRESHOLDS[i]
+    return {
+        "name": CAT_ORDER[i + 1],
+        "pointsNeeded": threshold - points,
+        "currentPoints": points,
+        "totalPoints": threshold,
+        "progress": (points / threshold) * 100
+    }
 
 def get_category_requirements(category: str) -> int:
     categories = {
@@ -161,152 +266,167 @@ def get_category_requirements(category: str) -> int:
     }
     return categories.get(category, 0)
 
+# ========== RANDOMNESS ==========
+
+# Bound once so the scan path skips the module-level random lookup
+_rand_points = random.Random().randrange
+
+# ========== USER PROJECTIONS ==========
+
+# Newest pointsHistory entries kept on the user document; writes trim the rest
+POINTS_HISTORY_LIMIT = 100
+
+# Full profile minus the password, with only the latest history entries
+PROJECTION_SUMMARY = {"password": 0, "pointsHistory": {"$slice": -20}}
+# Auth responses never show history
+PROJECTION_AUTH = {"studentId": 1, "name": 1, "email": 1, "avatar": 1, "points": 1, "category": 1}
+# Balance fields needed by scan/redeem
+PROJECTION_POINTS = {"points": 1, "category": 1}
+
 # ========== AUTH ENDPOINTS ==========
 
+def new_user_doc(credentials: UserLogin) -> dict:
+    # Same shape and defaults as User; every field is generated here, so the
+    # document is built directly instead of going through Pydantic validation
+    return {
+        "studentId": f"ST{secrets.randbelow(90000) + 10000}",
+        "name": credentials.email.split("@")[0].title(),
+        "email": credentials.email,
+        "password": credentials.password,
+        "avatar": credentials.email[0].upper(),
+        "points": 0,
+        "category": "Clásico",
+        "pointsHistory": [],
+        "recycledKg": 0.0,
+        "createdAt": datetime.utcnow()
+    }
+
 @api_router.post("/auth/login")
 async def login(credentials: UserLogin):
     # Mock authentication - accept any credentials
-    user = await db.users.find_one({"email": credentials.email})
+    user = await db.users.find_one({"email": credentials.email}, PROJECTION_AUTH)
     
     if not user:
         # Create a new user
-        new_user = User(
-            studentId=f"ST{random.randint(10000, 99999)}",
-            name=credentials.email.split("@")[0].title(),
-            email=credentials.email,
-            password=credentials.password,
-            avatar=credentials.email[0].upper()
-        )
-        result = await db.users.insert_one(new_user.dict())
-        user = await db.users.find_one({"_id": result.inserted_id})
+        user = new_user_doc(credentials)
+        try:
+            result = await db.users.insert_one(user)
+            user["_id"] = result.inserted_id
+        except DuplicateKeyError:
+            # A concurrent login created the same user first
+            user = await db.users.find_one({"email": credentials.email}, PROJECTION_AUTH)
     
-    user = str_object_id(user)
-    return {
+    return MongoJSONResponse({
         "success": True,
-        "user": {
-            "id": user["_id"],
-            "studentId": user["studentId"],
-            "name": user["name"],
-            "email": user["email"],
-            "avatar": user["avatar"],
-            "points": user["points"],
-            "category": user["category"]
-        },
+        "user": user_out(user),
         "token": "mock_token_123"
-    }
+    })
 
 @api_router.post("/auth/register")
 async def register(credentials: UserLogin):
     # Check if user exists
-    existing = await db.users.find_one({"email": credentials.email})
+    existing = await db.users.find_one({"email": credentials.email}, {"_id": 1})
     if existing:
         raise HTTPException(status_code=400, detail="Usuario ya existe")
     
-    new_user = User(
-        studentId=f"ST{random.randint(10000, 99999)}",
-        name=credentials.email.split("@")[0].title(),
-        email=credentials.email,
-        password=credentials.password,
-        avatar=credentials.email[0].upper()
-    )
-    result = await db.users.insert_one(new_user.dict())
-    user = await db.users.find_one({"_id": result.inserted_id})
-    user = str_object_id(user)
+    user = new_user_doc(credentials)
+    try:
+        result = await db.users.insert_one(user)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Usuario ya existe")
+    user["_id"] = result.inserted_id
     
-    return {
+    return MongoJSONResponse({
         "success": True,
-        "user": {
-            "id": user["_id"],
-            "studentId": user["studentId"],
-            "name": user["name"],
-            "email": user["email"],
-            "avatar": user["avatar"],
-            "points": user["points"],
-            "category": user["category"]
-        },
+        "user": user_out(user),
         "token": "mock_token_123"
-    }
+    })
 
 # ========== USER ENDPOINTS ==========
 
-@api_router.get("/users/{user_id}")
+@api_router.get("/users/{user_id}", response_model=None)
 async def get_user(user_id: str):
-    try:
-        user = await db.users.find_one({"_id": ObjectId(user_id)})
-        if not user:
-            raise HTTPException(status_code=404, detail="Usuario no encontrado")
-        
-        user = str_object_id(user)
-        next_cat = get_next_category_info(user["points"])
-        
-        return {
-            "id": user["_id"],
-            "studentId": user["studentId"],
-            "name": user["name"],
-            "email": user["email"],
-            "avatar": user["avatar"],
-            "points": user["points"],
-            "category": user["category"],
-            "pointsHistory": user.get("pointsHistory", []),
-            "recycledKg": user.get("recycledKg", 0.0),
-            "nextCategory": next_cat
-        }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    oid = parse_object_id(user_id)
+    user = await db.users.find_one({"_id": oid}, PROJECTION_SUMMARY)
+    if not user:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    
+    next_cat = get_next_category_info(user["points"])
+    
+    # Trusted DB data — never call on untrusted input
+    return struct_response(UserResponse(
+        id=str(user["_id"]),
+        studentId=user["studentId"],
+        name=user["name"],
+        email=user["email"],
+        avatar=user["avatar"],
+        points=user["points"],
+        category=user["category"],
+        pointsHistory=user.get("pointsHistory", []),
+        recycledKg=user.get("recycledKg", 0.0),
+        nextCategory=next_cat
+    ))
 
 # ========== CONTAINERS ENDPOINTS ==========
 
-@api_router.get("/containers")
+@api_router.get("/containers", response_model=None)
 async def get_containers():
-    containers = await db.containers.find().to_list(100)
-    return [{**str_object_id(c), "id": str(c["_id"])} for c in containers]
-
-@api_router.get("/containers/{container_id}")
+    payload = cache_get("containers")
+    if payload is None:
+        # Build the response list straight off the cursor and encode it once
+        containers = [container_response(c) async for c in db.containers.find().limit(100)]
+        payload = cache_set("containers", ENCODER.encode(containers))
+    return Response(payload, media_type="application/json")
+
+@api_router.get("/containers/{container_id}", response_model=None)
 async def get_container(container_id: str):
-    try:
-        container = await db.containers.find_one({"_id": ObjectId(container_id)})
-        if not container:
-            raise HTTPException(status_code=404, detail="Contenedor no encontrado")
-        return {**str_object_id(container), "id": str(container["_id"])}
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    oid = parse_object_id(container_id)
+    container = await db.containers.find_one({"_id": oid})
+    if not container:
+        raise HTTPException(status_code=404, detail="Contenedor no encontrado")
+    return struct_response(container_response(container))
 
 # ========== REWARDS ENDPOINTS ==========
 
-@api_router.get("/rewards")
+@api_router.get("/rewards", response_model=None)
 async def get_rewards(category: Optional[str] = None):
     query = {}
+    cache_key = "rewards"
     if category:
         # Get rewards available for this category
-        cat_order = ["Clásico", "Plata", "Oro", "Diamante", "Black"]
-        if category in cat_order:
-            idx = cat_order.index(category)
-            available_cats = cat_order[:idx+1]
+        if category in CAT_INDEX:
+            available_cats = list(CAT_ORDER[:CAT_INDEX[category]+1])
             query["category"] = {"$in": available_cats}
+            cache_key = f"rewards:{category}"
     
-    rewards = await db.rewards.find(query).to_list(100)
-    return [{**str_object_id(r), "id": str(r["_id"])} for r in rewards]
+    payload = cache_get(cache_key)
+    if payload is None:
+        rewards = [reward_response(r) async for r in db.rewards.find(query).limit(100)]
+        payload = cache_set(cache_key, ENCODER.encode(rewards))
+    return Response(payload, media_type="application/json")
 
-@api_router.get("/rewards/{reward_id}")
+@api_router.get("/rewards/{reward_id}", response_model=None)
 async def get_reward(reward_id: str):
-    try:
-        reward = await db.rewards.find_one({"_id": ObjectId(reward_id)})
-        if not reward:
-            raise HTTPException(status_code=404, detail="Recompensa no encontrada")
-        return {**str_object_id(reward), "id": str(reward["_id"])}
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    oid = parse_object_id(reward_id)
+    reward = await db.rewards.find_one({"_id": oid})
+    if not reward:
+        raise HTTPException(status_code=404, detail="Recompensa no encontrada")
+    return struct_response(reward_response(reward))
 
 @api_router.post("/rewards/redeem")
 async def redeem_reward(request: RedeemRequest):
     try:
-        # Get user
-        user = await db.users.find_one({"_id": ObjectId(request.userId)})
+        user_oid = parse_object_id(request.userId)
+        reward_oid = parse_object_id(request.rewardId)
+        
+        # Get user and reward concurrently
+        user, reward = await asyncio.gather(
+            db.users.find_one({"_id": user_oid}, PROJECTION_POINTS),
+            db.rewards.find_one({"_id": reward_oid})
+        )
         if not user:
             raise HTTPException(status_code=404, detail="Usuario no encontrado")
         
-        # Get reward
-        reward = await db.rewards.find_one({"_id": ObjectId(request.rewardId)})
         if not reward:
             raise HTTPException(status_code=404, detail="Recompensa no encontrada")
         
@@ -315,17 +435,12 @@ async def redeem_reward(request: RedeemRequest):
             raise HTTPException(status_code=400, detail="Puntos insuficientes")
         
         # Check category requirement
-        cat_order = ["Clásico", "Plata", "Oro", "Diamante", "Black"]
-        user_cat_idx = cat_order.index(user["category"])
-        reward_cat_idx = cat_order.index(reward["category"])
+        user_cat_idx = CAT_INDEX[user["category"]]
+        reward_cat_idx = CAT_INDEX[reward["category"]]
         
         if user_cat_idx < reward_cat_idx:
             raise HTTPException(status_code=400, detail="Categoría insuficiente")
         
-        # Deduct points
-        new_points = user["points"] - reward["pointsCost"]
-        new_category = get_category_from_points(new_points)
-        
         # Add to history
         history_item = {
             "date": datetime.utcnow(),
@@ -334,22 +449,34 @@ async def redeem_reward(request: RedeemRequest):
             "type": "redeemed"
         }
         
-        await db.users.update_one(
-            {"_id": ObjectId(request.userId)},
-            {
-                "$set": {
-                    "points": new_points,
-                    "category": new_category
-                },
-                "$push": {"pointsHistory": history_item}
-            }
+        # Deduct points atomically; the filter guards against a concurrent spend
+        # and the category is recomputed server-side in the same update
+        user = await db.users.find_one_and_update(
+            {"_id": user["_id"], "points": {"$gte": reward["pointsCost"]}},
+            [
+                {"$set": {
+                    "points": {"$add": ["$points", -reward["pointsCost"]]},
+                    "pointsHistory": {"$slice": [
+                        {"$concatArrays": [
+                            {"$ifNull": ["$pointsHistory", []]},
+                            {"$literal": [history_item]}
+                        ]},
+                        -POINTS_HISTORY_LIMIT
+                    ]}
+                }},
+                *CATEGORY_PIPELINE
+            ],
+            projection=PROJECTION_POINTS,
+            return_document=ReturnDocument.AFTER
         )
+        if not user:
+            raise HTTPException(status_code=400, detail="Puntos insuficientes")
         
         return {
             "success": True,
             "message": "Recompensa canjeada exitosamente",
-            "newPoints": new_points,
-            "newCategory": new_category
+            "newPoints": user["points"],
+            "newCategory": user["category"]
         }
     except HTTPException:
         raise
@@ -364,12 +491,10 @@ async def scan_qr(request: ScanQRRequest):
         # Validate QR code format (should be container ID)
         qr_data = request.qrCode
         
-        # Try to find container by ID or by special code
-        try:
-            container = await db.containers.find_one({"_id": ObjectId(qr_data)})
-        except:
-            # If not valid ObjectId, try to find by name or code
-            container = await db.containers.find_one({"name": qr_data})
+        # Find container by ID or by name in a single query
+        oid = ObjectId(qr_data) if _OID_RE.fullmatch(qr_data) else None
+        query = {"$or": [{"_id": oid}, {"name": qr_data}]} if oid else {"name": qr_data}
+        container = await db.containers.find_one(query)
         
         if not container:
             raise HTTPException(status_code=404, detail="Contenedor no válido")
@@ -377,18 +502,8 @@ async def scan_qr(request: ScanQRRequest):
         if container["status"] != "operational":
             raise HTTPException(status_code=400, detail="Contenedor en mantenimiento")
         
-        # Get user
-        user = await db.users.find_one({"_id": ObjectId(request.userId)})
-        if not user:
-            raise HTTPException(status_code=404, detail="Usuario no encontrado")
-        
         # Generate random points (10-50)
-        points_earned = random.randint(10, 50)
-        
-        # Update user points
-        new_points = user["points"] + points_earned
-        new_category = get_category_from_points(new_points)
-        new_kg = user.get("recycledKg", 0.0) + (points_earned * 0.1)  # 1 point = 0.1 kg
+        points_earned = _rand_points(10, 51)
         
         # Add to history
         history_item = {
@@ -398,20 +513,34 @@ async def scan_qr(request: ScanQRRequest):
             "type": "earned"
         }
         
-        await db.users.update_one(
-            {"_id": ObjectId(request.userId)},
-            {
-                "$set": {
-                    "points": new_points,
-                    "category": new_category,
-                    "recycledKg": new_kg
-                },
-                "$push": {"pointsHistory": history_item}
-            }
+        # Update user points and category in a single roundtrip
+        user = await db.users.find_one_and_update(
+            {"_id": parse_object_id(request.userId)},
+            [
+                {"$set": {
+                    "points": {"$add": ["$points", points_earned]},
+                    "recycledKg": {"$add": [
+                        {"$ifNull": ["$recycledKg", 0.0]},
+                        points_earned * 0.1  # 1 point = 0.1 kg
+                    ]},
+                    "pointsHistory": {"$slice": [
+                        {"$concatArrays": [
+                            {"$ifNull": ["$pointsHistory", []]},
+                            {"$literal": [history_item]}
+                        ]},
+                        -POINTS_HISTORY_LIMIT
+                    ]}
+                }},
+                *CATEGORY_PIPELINE
+            ],
+            projection=PROJECTION_POINTS,
+            return_document=ReturnDocument.AFTER
         )
+        if not user:
+            raise HTTPException(status_code=404, detail="Usuario no encontrado")
         
         # Save scan record
-        scan_record = QRScan(
+        scan_record = QRScan.model_construct(
             userId=request.userId,
             containerId=str(container["_id"]),
             pointsEarned=points_earned
@@ -421,8 +550,8 @@ async def scan_qr(request: ScanQRRequest):
         return {
             "success": True,
             "pointsEarned": points_earned,
-            "newPoints": new_points,
-            "newCategory": new_category,
+            "newPoints": user["points"],
+            "newCategory": user["category"],
             "containerName": container["name"],
             "kgRecycled": points_earned * 0.1
         }
@@ -479,8 +608,7 @@ async def init_data():
         )
     ]
     
-    for container in containers_data:
-        await db.containers.insert_one(container.dict())
+    await db.containers.insert_many([c.dict() for c in containers_data], ordered=False)
     
     # Create sample rewards
     rewards_data = [
@@ -590,8 +718,8 @@ async def init_data():
         )
     ]
     
-    for reward in rewards_data:
-        await db.rewards.insert_one(reward.dict())
+    await db.rewards.insert_many([r.dict() for r in rewards_data], ordered=False)
+    _CACHE.clear()
     
     return {
         "message": "Datos inicializados correctamente",
@@ -610,13 +738,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging once at import; call sites pass args instead of pre-formatted
+# strings so records below the level are never formatted
+logging.config.dictConfig({
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "default": {
+            "format": "{asctime} - {name} - {levelname} - {message}",
+            "style": "{"
+        }
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "default"}
+    },
+    "root": {"level": "INFO", "handlers": ["console"]}
+})
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def log_pydantic_build():
+    # Pydantic v2 validates in the compiled pydantic-core extension; log it to catch regressions
+    logger.info("pydantic %s (pydantic-core %s)", pydantic.VERSION, pydantic_core.__version__)
+
+@app.on_event("startup")
+async def warm_up_db_client():
+    # Open the first pooled connection before serving requests
+    await client.admin.command("ping")
+
+@app.on_event("startup")
+async def ensure_indexes():
+    await db.users.create_index("email", unique=True)
+    await db.containers.create_index("name")
+    await db.scans.create_index([("userId", 1), ("timestamp", -1)])
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()